@@ -1,13 +1,29 @@
 """Configuration module for GHL MCP Server."""
 
 import os
-from typing import List
-from pydantic import Field
+from functools import cached_property, lru_cache
+from typing import Dict, List, Literal, Union
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+from dotenv import find_dotenv, load_dotenv
+
+# Set once .env has been loaded; inherited by uvicorn reload/worker processes
+_DOTENV_SENTINEL = "_GHL_DOTENV_LOADED"
+
+
+def _load_dotenv_once() -> None:
+    """Load the .env file into os.environ once per process tree."""
+    if os.environ.get(_DOTENV_SENTINEL):
+        return
+    # find_dotenv only returns regular files, so a FIFO .env cannot block here
+    dotenv_path = find_dotenv()
+    if dotenv_path:
+        load_dotenv(dotenv_path)
+    os.environ[_DOTENV_SENTINEL] = "1"
+
 
 # Load environment variables from .env file
-load_dotenv()
+_load_dotenv_once()
 
 
 class Settings(BaseSettings):
@@ -32,9 +48,22 @@ class Settings(BaseSettings):
         description="GoHighLevel sub-account ID"
     )
     
+    ghl_max_concurrency: int = Field(
+        default=50,
+        env="GHL_MAX_CONCURRENCY",
+        description="Maximum concurrent in-flight GHL API requests per worker process"
+    )
+    
+    ghl_http_backend: Literal["httpx", "aiohttp"] = Field(
+        default="httpx",
+        env="GHL_HTTP_BACKEND",
+        description="Connection backend for GHL requests: httpx or aiohttp"
+    )
+    
     # Server Settings
-    allowed_origins: str = Field(
-        default="*",
+    # The str arm lets a comma-separated env value reach the validator below
+    allowed_origins: Union[List[str], str] = Field(
+        default=["*"],
         env="ALLOWED_ORIGINS",
         description="Allowed CORS origins"
     )
@@ -51,9 +80,17 @@ class Settings(BaseSettings):
         description="Host for MCP server"
     )
     
-    @property
+    @field_validator("allowed_origins", mode="before")
+    @classmethod
+    def split_allowed_origins(cls, value: Union[List[str], str]) -> List[str]:
+        """Parse a comma-separated origins string into a list."""
+        if isinstance(value, str):
+            return [origin.strip() for origin in value.split(",") if origin.strip()]
+        return value
+    
+    @cached_property
     def ghl_headers(self) -> dict:
-        """Get headers for GHL API requests."""
+        """Get headers for GHL API requests (built once per instance)."""
         return {
             "Authorization": f"Bearer {self.ghl_api_key}",
             "Content-Type": "application/json",
@@ -62,9 +99,23 @@ class Settings(BaseSettings):
     
     class Config:
         """Pydantic config."""
-        env_file = ".env"
+        # .env is already merged into os.environ by _load_dotenv_once
         case_sensitive = False
 
 
-# Global settings instance
-settings = Settings() 
\ No newline at end of file
+# Per-operation HTTP timeouts (seconds) for outbound GHL calls
+HTTP_TIMEOUTS: Dict[str, float] = {
+    "default": 30.0,
+    "trigger_webhook": 60.0,
+    "connect": 3.0,
+}
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings instance."""
+    return Settings()
+
+
+# Lifetime (seconds) of cached responses for idempotent GHL GET calls
+CACHE_TTL_SECONDS: float = 60.0
@@ -1,18 +1,189 @@
 """GoHighLevel API client for MCP server."""
 
+import asyncio
 import httpx
-from typing import Dict, List, Optional, Any
-from config import settings
+import ijson
+import orjson
+from async_lru import alru_cache
+from collections import ChainMap
+from typing import AsyncIterator, Dict, List, Optional, Any
+from config import CACHE_TTL_SECONDS, HTTP_TIMEOUTS, get_settings
+
+
+def _contact_search_params(
+    query: Optional[str],
+    email: Optional[str],
+    phone: Optional[str],
+    limit: int
+) -> Dict[str, Any]:
+    """Build /contacts/ search params, omitting unset filters."""
+    params = {"limit": limit}
+    if query:
+        params["query"] = query
+    if email:
+        params["email"] = email
+    if phone:
+        params["phone"] = phone
+    return params
+
+
+class _AiohttpStream(httpx.AsyncByteStream):
+    """Response body stream backed by an aiohttp response."""
+    
+    def __init__(self, response, request: httpx.Request, aiohttp):
+        self._response = response
+        self._request = request
+        self._aiohttp = aiohttp
+    
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield body chunks as aiohttp receives them.
+        
+        httpx reads the body after the transport returns, so read failures
+        are mapped to httpx exceptions here rather than in the transport.
+        """
+        try:
+            async for chunk in self._response.content.iter_any():
+                yield chunk
+        except asyncio.TimeoutError as e:
+            raise httpx.ReadTimeout(str(e), request=self._request) from e
+        except self._aiohttp.ClientError as e:
+            raise httpx.ReadError(str(e), request=self._request) from e
+    
+    async def aclose(self) -> None:
+        """Return the connection to aiohttp's pool."""
+        self._response.release()
+
+
+class AiohttpTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends requests over an aiohttp connection pool.
+    
+    Lets GHLClient keep its httpx-based API while benchmarking aiohttp's
+    connector; selected with GHL_HTTP_BACKEND=aiohttp.
+    """
+    
+    def __init__(self, limit: int = 100):
+        # Imported lazily so the default httpx backend never loads aiohttp
+        import aiohttp
+        
+        self._aiohttp = aiohttp
+        self._limit = limit
+        self._session = None
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send an httpx request through aiohttp and wrap the streamed response.
+        
+        aiohttp timeouts and client errors are re-raised as the matching httpx
+        exceptions so GHLClient's error handling is backend-independent.
+        """
+        aiohttp = self._aiohttp
+        if self._session is None:
+            # Created on first use so the session binds to the running loop;
+            # httpx handles content decoding, so aiohttp must not
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._limit, ttl_dns_cache=300),
+                auto_decompress=False
+            )
+        timeout = request.extensions.get("timeout", {})
+        try:
+            response = await self._session.request(
+                request.method,
+                str(request.url),
+                headers=[(k.decode("latin-1"), v.decode("latin-1")) for k, v in request.headers.raw],
+                data=await request.aread(),
+                timeout=aiohttp.ClientTimeout(
+                    connect=timeout.get("connect"),
+                    sock_read=timeout.get("read")
+                ),
+                allow_redirects=False
+            )
+        except asyncio.TimeoutError as e:
+            raise httpx.TimeoutException(str(e), request=request) from e
+        except aiohttp.ClientError as e:
+            raise httpx.TransportError(str(e), request=request) from e
+        return httpx.Response(
+            status_code=response.status,
+            headers=list(response.raw_headers),
+            stream=_AiohttpStream(response, request, aiohttp),
+            extensions={"http_version": f"HTTP/{response.version.major}.{response.version.minor}".encode()}
+        )
+    
+    async def aclose(self) -> None:
+        """Close the aiohttp session and its pooled connections."""
+        if self._session is not None:
+            await self._session.close()
 
 
 class GHLClient:
     """Client for interacting with GoHighLevel API."""
     
-    def __init__(self):
-        """Initialize the GHL client."""
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Initialize the GHL client, optionally over a custom httpx transport."""
+        settings = get_settings()
         self.base_url = settings.ghl_api_base_url
         self.headers = settings.ghl_headers
         self.sub_account_id = settings.ghl_sub_account_id
+        self._default_params = {"locationId": self.sub_account_id}
+        self._semaphore = asyncio.Semaphore(settings.ghl_max_concurrency)
+        if transport is None and settings.ghl_http_backend == "aiohttp":
+            transport = AiohttpTransport()
+        
+        # Shared clients so connections are pooled and kept alive across calls
+        limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(HTTP_TIMEOUTS["default"], connect=HTTP_TIMEOUTS["connect"]),
+            limits=limits,
+            http2=True,  # multiplex concurrent GHL calls over one connection
+            transport=transport
+        )
+        self._webhook_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                HTTP_TIMEOUTS["trigger_webhook"],
+                connect=HTTP_TIMEOUTS["connect"]
+            ),
+            limits=limits,
+            transport=transport
+        )
+        
+        # Response caches for idempotent GETs, built per instance so entries
+        # never outlive the client and invalidation stays local to it
+        cache = alru_cache(maxsize=1024, ttl=CACHE_TTL_SECONDS)
+        self.get_contact_info = cache(self._get_contact_info)
+        self.list_opportunities = cache(self._list_opportunities)
+        self.get_pipeline_info = cache(self._get_pipeline_info)
+        self.get_contact_activities = cache(self._get_contact_activities)
+        self._caches = (
+            self.get_contact_info,
+            self.list_opportunities,
+            self.get_pipeline_info,
+            self.get_contact_activities
+        )
+    
+    async def aclose(self) -> None:
+        """Close the response caches and the underlying HTTP clients."""
+        for cached in self._caches:
+            await cached.cache_close()
+            # Also cancels the TTL timers, which would otherwise keep entries alive
+            cached.cache_clear()
+        await self._client.aclose()
+        await self._webhook_client.aclose()
+    
+    async def warmup(self, connections: int = 1) -> None:
+        """Open connections to the GHL API ahead of the first real request.
+        
+        Failures are ignored; the first real request will simply connect itself.
+        """
+        await asyncio.gather(
+            *(self._client.head("", timeout=HTTP_TIMEOUTS["connect"]) for _ in range(connections)),
+            return_exceptions=True
+        )
+    
+    async def __aenter__(self) -> "GHLClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
         
     async def _make_request(
         self, 
@@ -22,38 +193,81 @@ class GHLClient:
         params: Optional[Dict] = None
     ) -> Dict[Any, Any]:
         """Make an HTTP request to the GHL API."""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        # Layer caller params over the sub-account default without copying
+        query = ChainMap(params, self._default_params) if params else self._default_params
         
-        # Add sub-account ID to params if not already present
-        if params is None:
-            params = {}
-        if "locationId" not in params:
-            params["locationId"] = self.sub_account_id
-            
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
+        # Bound queued work so bursts wait here instead of exhausting the pool
+        async with self._semaphore:
+            # Encode with orjson; Content-Type is already in the client headers
+            response = await self._client.request(
                 method=method,
-                url=url,
-                headers=self.headers,
-                json=data,
-                params=params,
-                timeout=30.0
+                url=endpoint.lstrip('/'),
+                content=orjson.dumps(data) if data is not None else None,
+                params=query
+            )
+        # The body is already buffered; check the status and parse the bytes directly
+        if not response.is_success:
+            raise httpx.HTTPStatusError(
+                f"{response.status_code} error for {method} {response.url}",
+                request=response.request,
+                response=response
             )
-            response.raise_for_status()
-            return response.json()
+        return orjson.loads(response.content)
+    
+    async def _stream_items(
+        self,
+        endpoint: str,
+        item_path: str,
+        params: Optional[Dict] = None
+    ) -> AsyncIterator[Dict[Any, Any]]:
+        """Stream a GET response, yielding each object under item_path as it is parsed.
+        
+        The concurrency permit and connection are held until the generator
+        finishes, so callers that may stop early should wrap it in
+        contextlib.aclosing() to release them promptly.
+        """
+        query = ChainMap(params, self._default_params) if params else self._default_params
+        
+        async with self._semaphore:
+            async with self._client.stream("GET", endpoint.lstrip('/'), params=query) as response:
+                if not response.is_success:
+                    await response.aread()
+                    raise httpx.HTTPStatusError(
+                        f"{response.status_code} error for GET {response.url}",
+                        request=response.request,
+                        response=response
+                    )
+                items = ijson.sendable_list()
+                parser = ijson.items_coro(items, item_path, use_float=True)
+                async for chunk in response.aiter_bytes():
+                    parser.send(chunk)
+                    for item in items:
+                        yield item
+                    del items[:]
+                parser.close()
+                for item in items:
+                    yield item
     
-    async def get_contact_info(self, contact_id: str) -> Dict[Any, Any]:
+    async def _get_contact_info(self, contact_id: str) -> Dict[Any, Any]:
         """Fetch contact details by ID."""
         return await self._make_request("GET", f"/contacts/{contact_id}")
     
-    async def list_opportunities(self, pipeline_id: Optional[str] = None) -> Dict[Any, Any]:
+    async def _list_opportunities(self, pipeline_id: Optional[str] = None) -> Dict[Any, Any]:
         """List all opportunities, optionally filtered by pipeline."""
         params = {}
         if pipeline_id:
             params["pipelineId"] = pipeline_id
         return await self._make_request("GET", "/opportunities/", params=params)
     
-    async def get_pipeline_info(self, pipeline_id: Optional[str] = None) -> Dict[Any, Any]:
+    def iter_opportunities(self, pipeline_id: Optional[str] = None) -> AsyncIterator[Dict[Any, Any]]:
+        """Stream opportunities one at a time instead of buffering the full list.
+        
+        Wrap in contextlib.aclosing() when breaking out early; see _stream_items.
+        """
+        params = {"pipelineId": pipeline_id} if pipeline_id else None
+        return self._stream_items("/opportunities/", "opportunities.item", params)
+    
+    async def _get_pipeline_info(self, pipeline_id: Optional[str] = None) -> Dict[Any, Any]:
         """Retrieve funnel/pipeline structure."""
         if pipeline_id:
             return await self._make_request("GET", f"/funnels/{pipeline_id}")
@@ -66,18 +280,20 @@ class GHLClient:
             "body": note_content,
             "contactId": contact_id
         }
-        return await self._make_request("POST", f"/contacts/{contact_id}/notes", data=data)
+        note = await self._make_request("POST", f"/contacts/{contact_id}/notes", data=data)
+        self.get_contact_info.cache_invalidate(contact_id)
+        self.get_contact_activities.cache_invalidate(contact_id)
+        return note
     
     async def trigger_webhook(self, webhook_url: str, payload: Dict[Any, Any]) -> Dict[Any, Any]:
         """Trigger a custom workflow webhook."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                webhook_url,
-                json=payload,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return {"status": "success", "response": response.text}
+        response = await self._webhook_client.post(
+            webhook_url,
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        return {"status": "success", "response": response.text}
     
     async def search_contacts(
         self, 
@@ -87,17 +303,24 @@ class GHLClient:
         limit: int = 100
     ) -> Dict[Any, Any]:
         """Search contacts with various filters."""
-        params = {"limit": limit}
-        if query:
-            params["query"] = query
-        if email:
-            params["email"] = email
-        if phone:
-            params["phone"] = phone
-            
+        params = _contact_search_params(query, email, phone, limit)
         return await self._make_request("GET", "/contacts/", params=params)
     
-    async def get_contact_activities(self, contact_id: str) -> Dict[Any, Any]:
+    def iter_contacts(
+        self, 
+        query: Optional[str] = None,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        limit: int = 100
+    ) -> AsyncIterator[Dict[Any, Any]]:
+        """Stream contact search results one at a time instead of buffering them.
+        
+        Wrap in contextlib.aclosing() when breaking out early; see _stream_items.
+        """
+        params = _contact_search_params(query, email, phone, limit)
+        return self._stream_items("/contacts/", "contacts.item", params)
+    
+    async def _get_contact_activities(self, contact_id: str) -> Dict[Any, Any]:
         """Get activities for a specific contact."""
         return await self._make_request("GET", f"/contacts/{contact_id}/activities")
     
@@ -119,8 +342,38 @@ class GHLClient:
         if value:
             data["monetaryValue"] = value
             
-        return await self._make_request("POST", "/opportunities/", data=data)
+        opportunity = await self._make_request("POST", "/opportunities/", data=data)
+        self.list_opportunities.cache_clear()
+        return opportunity
+
+
+# Process-wide client instance, created lazily inside the running event loop
+_ghl_client: Optional[GHLClient] = None
+# Set by close_ghl_client so late calls fail instead of leaking a new client
+_ghl_client_closed = False
+
+
+def open_ghl_client() -> GHLClient:
+    """Return the shared GHL client for a starting app, reopening it after a close."""
+    global _ghl_client_closed
+    _ghl_client_closed = False
+    return get_ghl_client()
+
+
+def get_ghl_client() -> GHLClient:
+    """Return the shared GHL client, creating it on first use."""
+    global _ghl_client
+    if _ghl_client is None:
+        if _ghl_client_closed:
+            raise RuntimeError("GHL client is closed; the server is shutting down")
+        _ghl_client = GHLClient()
+    return _ghl_client
 
 
-# Global client instance
-ghl_client = GHLClient() 
\ No newline at end of file
+async def close_ghl_client() -> None:
+    """Close and discard the shared GHL client."""
+    global _ghl_client, _ghl_client_closed
+    _ghl_client_closed = True
+    if _ghl_client is not None:
+        await _ghl_client.aclose()
+        _ghl_client = None 
\ No newline at end of file
@@ -1,14 +1,22 @@
 """MCP Server for GoHighLevel integration."""
 
 import asyncio
+import inspect
+import os
+import orjson
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from mcp.server import Server
 from mcp.types import Resource, Tool, TextContent, ImageContent, EmbeddedResource
 
-from config import settings
+from config import get_settings
+from ghl_client import close_ghl_client, open_ghl_client
+from tool_schemas import load_tool_schemas
 import mcp_tools
 
 
@@ -25,17 +33,37 @@ class MCPResponse(BaseModel):
     error: Optional[str] = None
 
 
+# Reused validator so request bodies can be parsed after the tool lookup
+_MCPRequestAdapter = TypeAdapter(MCPRequest)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the pooled GHL client for the lifetime of the app."""
+    client = open_ghl_client()
+    try:
+        # Pay DNS + TCP + TLS now rather than on the first tool call
+        await client.warmup()
+        yield
+    finally:
+        await close_ghl_client()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="GHL MCP Server",
     description="Model Connection Protocol server for GoHighLevel integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+settings = get_settings()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins.split(",") if settings.allowed_origins != "*" else ["*"],
+    allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -57,6 +85,51 @@ AVAILABLE_TOOLS = {
 }
 
 
+def _compile_dispatcher(tool_name: str, tool_func):
+    """Generate a wrapper that calls tool_func positionally from an args dict."""
+    parameters = inspect.signature(tool_func).parameters
+    namespace = {"_func": tool_func, "_known": frozenset(parameters)}
+    call_args = []
+    for name, param in parameters.items():
+        if param.default is inspect.Parameter.empty:
+            call_args.append(f"args[{name!r}]")
+        else:
+            namespace[f"_default_{name}"] = param.default
+            call_args.append(f"args.get({name!r}, _default_{name})")
+    source = (
+        f"async def _call_{tool_name}(args):\n"
+        f"    if not args.keys() <= _known:\n"
+        f"        unknown = ', '.join(sorted(args.keys() - _known))\n"
+        f"        raise TypeError(f'{tool_name}() got unexpected arguments: {{unknown}}')\n"
+        f"    try:\n"
+        f"        call = _func({', '.join(call_args)})\n"
+        f"    except KeyError as e:\n"
+        f"        raise TypeError(f'{tool_name}() missing required argument: {{e}}') from None\n"
+        f"    return await call\n"
+    )
+    exec(source, namespace)
+    return namespace[f"_call_{tool_name}"]
+
+
+# Argument binding is fixed per tool, so compile a direct call for each
+AVAILABLE_TOOLS_FAST = {
+    tool_name: _compile_dispatcher(tool_name, tool_func)
+    for tool_name, tool_func in AVAILABLE_TOOLS.items()
+}
+
+# Tool metadata is static for the process lifetime, so load it once
+_SCHEMAS = load_tool_schemas(AVAILABLE_TOOLS)
+_TOOLS_INFO = [
+    {
+        "name": schema["name"],
+        "description": schema["description"],
+        "parameters": schema["inputSchema"]["properties"]
+    }
+    for schema in _SCHEMAS
+]
+_MCP_TOOLS = [Tool(**schema) for schema in _SCHEMAS]
+
+
 @app.get("/")
 async def root():
     """Root endpoint with server information."""
@@ -78,25 +151,13 @@ async def health_check():
 @app.get("/tools")
 async def list_tools():
     """List all available tools."""
-    tools_info = []
-    for tool_name, tool_func in AVAILABLE_TOOLS.items():
-        tools_info.append({
-            "name": tool_name,
-            "description": tool_func.__doc__ or "No description available",
-            "parameters": getattr(tool_func, '__annotations__', {})
-        })
-    return {"tools": tools_info}
-
-
-@app.post("/tools/{tool_name}")
-async def call_tool(tool_name: str, request: MCPRequest):
-    """Call a specific tool with the provided arguments."""
-    if tool_name not in AVAILABLE_TOOLS:
-        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
-    
+    return {"tools": _TOOLS_INFO}
+
+
+async def _run_tool(tool_name: str, arguments: Dict[str, Any]):
+    """Execute a registered tool and wrap the outcome in an MCPResponse."""
     try:
-        tool_func = AVAILABLE_TOOLS[tool_name]
-        result = await tool_func(**request.arguments)
+        result = await AVAILABLE_TOOLS_FAST[tool_name](arguments)
         
         return MCPResponse(
             success=True,
@@ -110,27 +171,45 @@ async def call_tool(tool_name: str, request: MCPRequest):
         )
 
 
+@app.post(
+    "/tools/{tool_name}",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": MCPRequest.model_json_schema()}}
+        }
+    }
+)
+async def call_tool(tool_name: str, request: Request):
+    """Call a specific tool with the provided arguments."""
+    # Resolve the tool before touching the body so unknown tools 404 cheaply
+    if tool_name not in AVAILABLE_TOOLS_FAST:
+        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    
+    try:
+        body = _MCPRequestAdapter.validate_json(await request.body())
+    except ValidationError as e:
+        # Match FastAPI's own body errors, which are located under "body"
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+    
+    return await _run_tool(tool_name, body.arguments)
+
+
 @app.post("/mcp/call_tool")
 async def mcp_call_tool(request: MCPRequest):
     """MCP-compatible tool calling endpoint."""
-    return await call_tool(request.tool_name, request)
+    if request.tool_name not in AVAILABLE_TOOLS_FAST:
+        raise HTTPException(status_code=404, detail=f"Tool '{request.tool_name}' not found")
+    
+    return await _run_tool(request.tool_name, request.arguments)
 
 
 @app.get("/mcp/list_tools")
 async def mcp_list_tools():
     """MCP-compatible tool listing endpoint."""
-    tools = []
-    for tool_name, tool_func in AVAILABLE_TOOLS.items():
-        tools.append(Tool(
-            name=tool_name,
-            description=tool_func.__doc__ or "No description available",
-            inputSchema={
-                "type": "object",
-                "properties": getattr(tool_func, '__annotations__', {}),
-                "required": []
-            }
-        ))
-    return {"tools": tools}
+    return {"tools": _MCP_TOOLS}
 
 
 # MCP Server event handlers
@@ -175,18 +254,7 @@ async def handle_read_resource(uri: str) -> str:
 @mcp_server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """Handle tool listing requests."""
-    tools = []
-    for tool_name, tool_func in AVAILABLE_TOOLS.items():
-        tools.append(Tool(
-            name=tool_name,
-            description=tool_func.__doc__ or "No description available",
-            inputSchema={
-                "type": "object", 
-                "properties": getattr(tool_func, '__annotations__', {}),
-                "required": []
-            }
-        ))
-    return tools
+    return _MCP_TOOLS
 
 
 @mcp_server.call_tool()
@@ -196,12 +264,11 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
         raise ValueError(f"Unknown tool: {name}")
     
     try:
-        tool_func = AVAILABLE_TOOLS[name]
-        result = await tool_func(**arguments)
+        result = await AVAILABLE_TOOLS_FAST[name](arguments)
         
         return [TextContent(
             type="text",
-            text=str(result)
+            text=orjson.dumps(result).decode()
         )]
     except Exception as e:
         return [TextContent(
@@ -216,5 +283,9 @@ if __name__ == "__main__":
         "mcp_server:app",
         host=settings.mcp_server_host,
         port=settings.mcp_server_port,
-        reload=True
+        reload=os.getenv("MCP_DEV") == "1",
+        loop="uvloop",
+        http="httptools",
+        log_level=os.getenv("MCP_LOG_LEVEL", "warning"),
+        access_log=False
     ) 
\ No newline at end of file
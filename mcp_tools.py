@@ -1,9 +1,24 @@
 """MCP tools for GoHighLevel integration."""
 
+import functools
 from typing import Dict, List, Optional, Any
-from ghl_client import ghl_client
+from ghl_client import get_ghl_client
 
 
+def _tool_result(key: str):
+    """Wrap a tool's result under `key` in a success envelope, or report its error."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Dict[Any, Any]:
+            try:
+                return {"success": True, key: await func(*args, **kwargs)}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+        return wrapper
+    return decorator
+
+
+@_tool_result("contact")
 async def get_contact_info(contact_id: str) -> Dict[Any, Any]:
     """
     Fetch detailed contact information from GoHighLevel.
@@ -14,19 +29,10 @@ async def get_contact_info(contact_id: str) -> Dict[Any, Any]:
     Returns:
         Dict containing contact details including name, email, phone, tags, etc.
     """
-    try:
-        contact_data = await ghl_client.get_contact_info(contact_id)
-        return {
-            "success": True,
-            "contact": contact_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().get_contact_info(contact_id)
 
 
+@_tool_result("opportunities")
 async def list_opportunities(pipeline_id: Optional[str] = None) -> Dict[Any, Any]:
     """
     List all opportunities in the GHL sub-account.
@@ -37,19 +43,10 @@ async def list_opportunities(pipeline_id: Optional[str] = None) -> Dict[Any, Any
     Returns:
         Dict containing list of opportunities with their details
     """
-    try:
-        opportunities_data = await ghl_client.list_opportunities(pipeline_id)
-        return {
-            "success": True,
-            "opportunities": opportunities_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().list_opportunities(pipeline_id)
 
 
+@_tool_result("result")
 async def trigger_webhook(webhook_url: str, payload: Dict[Any, Any]) -> Dict[Any, Any]:
     """
     Trigger a custom workflow webhook in GoHighLevel.
@@ -61,19 +58,10 @@ async def trigger_webhook(webhook_url: str, payload: Dict[Any, Any]) -> Dict[Any
     Returns:
         Dict containing webhook response status
     """
-    try:
-        result = await ghl_client.trigger_webhook(webhook_url, payload)
-        return {
-            "success": True,
-            "result": result
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().trigger_webhook(webhook_url, payload)
 
 
+@_tool_result("pipelines")
 async def get_pipeline_info(pipeline_id: Optional[str] = None) -> Dict[Any, Any]:
     """
     Retrieve funnel/pipeline structure from GoHighLevel.
@@ -84,19 +72,10 @@ async def get_pipeline_info(pipeline_id: Optional[str] = None) -> Dict[Any, Any]
     Returns:
         Dict containing pipeline structure and stages
     """
-    try:
-        pipeline_data = await ghl_client.get_pipeline_info(pipeline_id)
-        return {
-            "success": True,
-            "pipelines": pipeline_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().get_pipeline_info(pipeline_id)
 
 
+@_tool_result("note")
 async def create_note(contact_id: str, note_content: str) -> Dict[Any, Any]:
     """
     Create a note on a specific contact in GoHighLevel.
@@ -108,19 +87,10 @@ async def create_note(contact_id: str, note_content: str) -> Dict[Any, Any]:
     Returns:
         Dict containing the created note details
     """
-    try:
-        note_data = await ghl_client.create_note(contact_id, note_content)
-        return {
-            "success": True,
-            "note": note_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().create_note(contact_id, note_content)
 
 
+@_tool_result("contacts")
 async def search_contacts(
     query: Optional[str] = None,
     email: Optional[str] = None,
@@ -139,19 +109,10 @@ async def search_contacts(
     Returns:
         Dict containing matching contacts
     """
-    try:
-        contacts_data = await ghl_client.search_contacts(query, email, phone, limit)
-        return {
-            "success": True,
-            "contacts": contacts_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().search_contacts(query, email, phone, limit)
 
 
+@_tool_result("activities")
 async def get_contact_activities(contact_id: str) -> Dict[Any, Any]:
     """
     Get activities for a specific contact in GoHighLevel.
@@ -162,19 +123,10 @@ async def get_contact_activities(contact_id: str) -> Dict[Any, Any]:
     Returns:
         Dict containing contact activities and timeline
     """
-    try:
-        activities_data = await ghl_client.get_contact_activities(contact_id)
-        return {
-            "success": True,
-            "activities": activities_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().get_contact_activities(contact_id)
 
 
+@_tool_result("opportunity")
 async def create_opportunity(
     contact_id: str,
     pipeline_id: str,
@@ -195,19 +147,9 @@ async def create_opportunity(
     Returns:
         Dict containing the created opportunity details
     """
-    try:
-        opportunity_data = await ghl_client.create_opportunity(
-            contact_id, pipeline_id, stage_id, title, value
-        )
-        return {
-            "success": True,
-            "opportunity": opportunity_data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+    return await get_ghl_client().create_opportunity(
+        contact_id, pipeline_id, stage_id, title, value
+    )
 
 
 # Export all tools for the MCP server
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Generate tool_schemas.json from the functions exported by mcp_tools."""
+
+import sys
+from pathlib import Path
+
+import orjson
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import mcp_tools
+from tool_schemas import SCHEMAS_PATH, build_tool_schemas
+
+
+def main():
+    """Write the JSON Schemas for every exported tool."""
+    tools = {name: getattr(mcp_tools, name) for name in mcp_tools.__all__}
+    schemas = build_tool_schemas(tools)
+    SCHEMAS_PATH.write_bytes(orjson.dumps(schemas, option=orjson.OPT_INDENT_2) + b"\n")
+    print(f"✅ Wrote {len(schemas)} tool schemas to {SCHEMAS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,99 @@
 #!/usr/bin/env python3
-"""Startup script for GHL MCP Server."""
+"""Startup script for GHL MCP Server.
+
+For container images, precompile bytecode at build time so cold starts
+skip the .py -> .pyc step for the project and its dependencies:
+
+    python -m compileall -q -j 0 . "$(python -c 'import site; print(site.getsitepackages()[0])')"
+
+Leave PYTHONDONTWRITEBYTECODE unset at runtime (any non-empty value
+disables writing), and do not pass -b: legacy .pyc files next to the
+sources are ignored while the .py files are present.
+"""
 
 import os
 import sys
-import asyncio
-import uvicorn
 from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from config import settings
-
 
 def main():
     """Start the GHL MCP Server."""
+    # Imported here so `import start_server` stays cheap; uvicorn is only
+    # needed by the dev branch, gunicorn loads the app itself
+    from config import get_settings
+    
+    settings = get_settings()
+    
     print("🚀 Starting GHL MCP Server")
     print(f"📍 Host: {settings.mcp_server_host}")
     print(f"🔌 Port: {settings.mcp_server_port}")
     print(f"🔧 Sub-account: {settings.ghl_sub_account_id}")
     print("=" * 50)
     
-    # Check required environment variables
-    required_vars = ["GHL_API_KEY", "GHL_SUB_ACCOUNT_ID"]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    env = os.environ
+    
+    # Check required environment variables (already resolved by Settings)
+    required_vars = {
+        "GHL_API_KEY": settings.ghl_api_key,
+        "GHL_SUB_ACCOUNT_ID": settings.ghl_sub_account_id,
+    }
+    missing_vars = [var for var, value in required_vars.items() if not value]
     
     if missing_vars:
         print(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
         print("Please check your .env file or environment setup.")
         sys.exit(1)
     
+    log_level = env.get("MCP_LOG_LEVEL", "warning")
+    
+    if env.get("MCP_DEV") == "1":
+        # Single process with the file-watching reloader for local development
+        import uvicorn
+        
+        try:
+            uvicorn.run(
+                "mcp_server:app",
+                host=settings.mcp_server_host,
+                port=settings.mcp_server_port,
+                loop="uvloop",
+                http="httptools",
+                reload=True,
+                log_level=log_level,
+                access_log=False
+            )
+        except KeyboardInterrupt:
+            print("\n👋 Server stopped by user")
+        except Exception as e:
+            print(f"❌ Server error: {e}")
+            sys.exit(1)
+        return
+    
+    # One uvicorn worker per core under gunicorn; --preload imports the
+    # app once in the master so workers share its pages copy-on-write
+    workers = int(env.get("MCP_WORKERS") or (os.cpu_count() or 1) * 2 + 1)
+    
+    # GHL_MAX_CONCURRENCY bounds each worker's own GHLClient, so the
+    # server as a whole can have workers times that many calls in flight
+    print(f"👷 Workers: {workers} (up to {settings.ghl_max_concurrency} GHL calls each)")
+    
     try:
-        uvicorn.run(
+        os.execvp("gunicorn", [
+            "gunicorn",
             "mcp_server:app",
-            host=settings.mcp_server_host,
-            port=settings.mcp_server_port,
-            reload=True,
-            log_level="info"
-        )
-    except KeyboardInterrupt:
-        print("\n👋 Server stopped by user")
-    except Exception as e:
-        print(f"❌ Server error: {e}")
+            "--chdir", str(project_root),
+            "-k", "uvicorn_worker.UvicornWorker",
+            "-w", str(workers),
+            "-b", f"{settings.mcp_server_host}:{settings.mcp_server_port}",
+            "--log-level", log_level,
+            "--preload"
+        ])
+    except OSError as e:
+        print(f"❌ Could not start gunicorn: {e}")
         sys.exit(1)
 
-
 if __name__ == "__main__":
     main() 
\ No newline at end of file
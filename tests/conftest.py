@@ -2,10 +2,24 @@
 
 import pytest
 import os
+import httpx
 from unittest.mock import patch
+from config import get_settings
 
 
-@pytest.fixture(autouse=True)
+# Canned upstream responses keyed by (method, path); anything else is a 404
+GHL_ROUTES = {
+    ("GET", "/v1/contacts/test_contact_id"): {"json": {"id": "test_contact", "name": "Test User"}},
+    ("GET", "/v1/contacts/contact123"): {"json": {"id": "contact123", "name": "Test User"}},
+    ("GET", "/v1/contacts/"): {"json": {"contacts": [{"id": "contact1", "email": "test@example.com"}]}},
+    ("POST", "/v1/contacts/contact123/notes"): {"json": {"id": "note123", "body": "Test note"}},
+    ("GET", "/v1/opportunities/"): {"json": {"opportunities": [{"id": "opp1", "title": "Test Opportunity"}]}},
+    ("POST", "/v1/opportunities/"): {"json": {"id": "opp123", "title": "New Opportunity"}},
+    ("POST", "/"): {"text": "Success"},
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
 def mock_env_vars():
     """Mock environment variables for testing."""
     with patch.dict(os.environ, {
@@ -14,4 +28,26 @@ def mock_env_vars():
         'GHL_API_BASE_URL': 'https://test.gohighlevel.com/v1',
         'ALLOWED_ORIGINS': '*'
     }):
-        yield 
\ No newline at end of file
+        # Test modules import mcp_server, and with it the settings, at collection
+        get_settings.cache_clear()
+        yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def sent_requests():
+    """Requests received by the mock transport, in order."""
+    return []
+
+
+@pytest.fixture(scope="session")
+def mock_transport(sent_requests):
+    """Serve GHL_ROUTES through httpx's real request pipeline."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_requests.append(request)
+        route = GHL_ROUTES.get((request.method, request.url.path))
+        if route is None:
+            return httpx.Response(404, json={"message": "Not found"})
+        return httpx.Response(200, **route)
+
+    return httpx.MockTransport(handler)
@@ -1,122 +1,279 @@
 """Tests for GHL client functionality."""
 
+import asyncio
+import contextlib
 import pytest
 import httpx
-from unittest.mock import AsyncMock, patch
-from ghl_client import GHLClient
+import orjson
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import ghl_client as ghl_client_module
+from ghl_client import AiohttpTransport, GHLClient, close_ghl_client, get_ghl_client, open_ghl_client
 
 
-@pytest.fixture
-def ghl_client():
-    """Create a GHL client for testing."""
-    return GHLClient()
+@pytest.fixture(scope="session")
+def ghl_client(mock_transport):
+    """Create a GHL client shared by all tests."""
+    return GHLClient(transport=mock_transport)
 
 
-@pytest.fixture
-def mock_response():
-    """Create a mock HTTP response."""
-    response = AsyncMock()
-    response.json.return_value = {"id": "test_contact", "name": "Test User"}
-    response.raise_for_status.return_value = None
-    return response
+@pytest.fixture(autouse=True)
+def clear_response_cache(ghl_client, sent_requests):
+    """Reset cached GET responses so tests sharing the client stay independent."""
+    yield
+    sent_requests.clear()
+    ghl_client.get_contact_info.cache_clear()
+    ghl_client.list_opportunities.cache_clear()
+    ghl_client.get_pipeline_info.cache_clear()
+    ghl_client.get_contact_activities.cache_clear()
 
 
 @pytest.mark.asyncio
-async def test_get_contact_info(ghl_client, mock_response):
+async def test_get_contact_info(ghl_client):
     """Test getting contact information."""
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.request = AsyncMock(return_value=mock_response)
-        
-        result = await ghl_client.get_contact_info("test_contact_id")
-        
-        assert result["id"] == "test_contact"
-        assert result["name"] == "Test User"
+    result = await ghl_client.get_contact_info("test_contact_id")
+
+    assert result["id"] == "test_contact"
+    assert result["name"] == "Test User"
 
 
 @pytest.mark.asyncio
-async def test_list_opportunities(ghl_client, mock_response):
+async def test_list_opportunities(ghl_client):
     """Test listing opportunities."""
-    mock_response.json.return_value = {"opportunities": [{"id": "opp1", "title": "Test Opportunity"}]}
-    
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.request = AsyncMock(return_value=mock_response)
-        
-        result = await ghl_client.list_opportunities()
-        
-        assert "opportunities" in result
-        assert len(result["opportunities"]) == 1
+    result = await ghl_client.list_opportunities()
+
+    assert "opportunities" in result
+    assert len(result["opportunities"]) == 1
 
 
 @pytest.mark.asyncio
-async def test_create_note(ghl_client, mock_response):
+async def test_create_note(ghl_client, sent_requests):
     """Test creating a contact note."""
-    mock_response.json.return_value = {"id": "note123", "body": "Test note"}
-    
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.request = AsyncMock(return_value=mock_response)
-        
-        result = await ghl_client.create_note("contact123", "Test note")
-        
-        assert result["id"] == "note123"
-        assert result["body"] == "Test note"
+    result = await ghl_client.create_note("contact123", "Test note")
+
+    assert result["id"] == "note123"
+    assert result["body"] == "Test note"
+    assert orjson.loads(sent_requests[-1].content) == {"body": "Test note", "contactId": "contact123"}
+    assert sent_requests[-1].headers["Content-Type"] == "application/json"
 
 
 @pytest.mark.asyncio
 async def test_trigger_webhook(ghl_client):
     """Test triggering a webhook."""
-    mock_response = AsyncMock()
-    mock_response.text = "Success"
-    mock_response.raise_for_status.return_value = None
-    
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-        
-        result = await ghl_client.trigger_webhook("https://test.webhook.url", {"test": "data"})
-        
-        assert result["status"] == "success"
-        assert result["response"] == "Success"
+    result = await ghl_client.trigger_webhook("https://test.webhook.url", {"test": "data"})
+
+    assert result["status"] == "success"
+    assert result["response"] == "Success"
 
 
 @pytest.mark.asyncio
-async def test_search_contacts(ghl_client, mock_response):
+async def test_search_contacts(ghl_client):
     """Test searching contacts."""
-    mock_response.json.return_value = {"contacts": [{"id": "contact1", "email": "test@example.com"}]}
-    
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.request = AsyncMock(return_value=mock_response)
-        
-        result = await ghl_client.search_contacts(email="test@example.com")
-        
-        assert "contacts" in result
-        assert len(result["contacts"]) == 1
+    result = await ghl_client.search_contacts(email="test@example.com")
+
+    assert "contacts" in result
+    assert len(result["contacts"]) == 1
 
 
 @pytest.mark.asyncio
-async def test_create_opportunity(ghl_client, mock_response):
+async def test_create_opportunity(ghl_client):
     """Test creating an opportunity."""
-    mock_response.json.return_value = {"id": "opp123", "title": "New Opportunity"}
-    
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.request = AsyncMock(return_value=mock_response)
-        
-        result = await ghl_client.create_opportunity(
-            "contact123", "pipeline123", "stage123", "New Opportunity", 1000.0
-        )
-        
-        assert result["id"] == "opp123"
-        assert result["title"] == "New Opportunity"
+    result = await ghl_client.create_opportunity(
+        "contact123", "pipeline123", "stage123", "New Opportunity", 1000.0
+    )
+
+    assert result["id"] == "opp123"
+    assert result["title"] == "New Opportunity"
 
 
 @pytest.mark.asyncio
 async def test_http_error_handling(ghl_client):
     """Test HTTP error handling."""
-    with patch('httpx.AsyncClient') as mock_client:
-        # Simulate HTTP error
-        mock_request = AsyncMock()
-        mock_request.raise_for_status.side_effect = httpx.HTTPStatusError(
-            "404 Not Found", request=None, response=None
-        )
-        mock_client.return_value.__aenter__.return_value.request = AsyncMock(return_value=mock_request)
-        
+    with pytest.raises(httpx.HTTPStatusError):
+        await ghl_client.get_contact_info("nonexistent_contact")
+
+
+@pytest.mark.asyncio
+async def test_location_id_added_to_params(ghl_client, sent_requests):
+    """Test that the sub-account ID is sent without mutating caller params."""
+    params = {"pipelineId": "pipeline123"}
+
+    await ghl_client._make_request("GET", "/opportunities/", params=params)
+
+    sent = dict(sent_requests[-1].url.params)
+    assert sent == {"pipelineId": "pipeline123", "locationId": "test_sub_account"}
+    assert params == {"pipelineId": "pipeline123"}
+
+
+@pytest.mark.asyncio
+async def test_get_contact_info_cached_until_note_created(ghl_client, sent_requests):
+    """Test that contact lookups are cached and invalidated by writes."""
+    await ghl_client.get_contact_info("contact123")
+    await ghl_client.get_contact_info("contact123")
+    assert len(sent_requests) == 1
+
+    await ghl_client.create_note("contact123", "Test note")
+    await ghl_client.get_contact_info("contact123")
+    assert len(sent_requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_response_caches_are_per_instance(ghl_client, mock_transport, sent_requests):
+    """Test that each client has its own cache, cleared on write and on close."""
+    await ghl_client.list_opportunities()
+    async with GHLClient(transport=mock_transport) as other:
+        await other.list_opportunities()
+        assert len(sent_requests) == 2
+
+        await other.create_opportunity("contact123", "pipeline123", "stage123", "New Opportunity")
+        assert ghl_client.list_opportunities.cache_info().currsize == 1
+        assert other.list_opportunities.cache_info().currsize == 0
+
+        await other.get_contact_info("contact123")
+    assert other.get_contact_info.cache_info().currsize == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_opportunities_streams_chunked_body():
+    """Test that list items are yielded from a body split across chunks."""
+    async def body():
+        yield b'{"opportunities": [{"id": "opp1", "value": 1.5}, {"id": '
+        yield b'"opp2"}]}'
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body()))
+    async with GHLClient(transport=transport) as client:
+        opportunities = [opportunity async for opportunity in client.iter_opportunities("pipeline123")]
+
+    assert opportunities == [{"id": "opp1", "value": 1.5}, {"id": "opp2"}]
+    assert client._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_iter_contacts_aclosing_releases_permit_on_early_exit():
+    """Test that breaking out of an aclosing()-wrapped stream frees its permit."""
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"contacts": [{"id": "c1"}, {"id": "c2"}]})
+    )
+    async with GHLClient(transport=transport) as client:
+        client._semaphore = asyncio.Semaphore(1)
+        async with contextlib.aclosing(client.iter_contacts(email="test@example.com")) as contacts:
+            async for contact in contacts:
+                break
+        assert not client._semaphore.locked()
+
+    assert contact == {"id": "c1"}
+
+
+@pytest.mark.asyncio
+async def test_warmup_ignores_connection_errors():
+    """Test that warmup opens a connection and never raises."""
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise httpx.ConnectError("unreachable", request=request)
+
+    async with GHLClient(transport=httpx.MockTransport(handler)) as client:
+        await client.warmup(connections=2)
+
+    assert [request.method for request in attempts] == ["HEAD", "HEAD"]
+
+
+@pytest.mark.asyncio
+async def test_redirect_raises_status_error():
+    """Test that non-2xx responses other than errors still raise HTTPStatusError."""
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(302, headers={"Location": "https://elsewhere.test/"})
+    )
+    async with GHLClient(transport=transport) as client:
         with pytest.raises(httpx.HTTPStatusError):
-            await ghl_client.get_contact_info("nonexistent_contact") 
\ No newline at end of file
+            await client.get_pipeline_info("pipeline123")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_request(ghl_client, sent_requests):
+    """Test that concurrent cached lookups for the same contact hit GHL once."""
+    results = await asyncio.gather(*(ghl_client.get_contact_info("contact123") for _ in range(5)))
+
+    assert len(sent_requests) == 1
+    assert all(result["id"] == "contact123" for result in results)
+
+
+@pytest.mark.asyncio
+async def test_shared_client_not_recreated_after_close(monkeypatch):
+    """Test that the shared client cannot be silently rebuilt after shutdown."""
+    monkeypatch.setattr(ghl_client_module, "_ghl_client_closed", False)
+    client = open_ghl_client()
+    assert get_ghl_client() is client
+
+    await close_ghl_client()
+    with pytest.raises(RuntimeError, match="closed"):
+        get_ghl_client()
+
+    assert open_ghl_client() is not client
+    await close_ghl_client()
+
+
+@pytest.fixture
+async def aiohttp_ghl_client():
+    """GHL client using AiohttpTransport against a local aiohttp server."""
+    async def get_contact(request):
+        return web.json_response({"id": request.match_info["contact_id"]})
+
+    async def not_found(request):
+        return web.json_response({"message": "Not found"}, status=404)
+
+    async def stalled(request):
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        await response.write(b'{"id": ')
+        await asyncio.sleep(1)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/v1/contacts/missing", not_found)
+    app.router.add_get("/v1/contacts/stalled", stalled)
+    app.router.add_get("/v1/contacts/{contact_id}", get_contact)
+    async with TestServer(app) as server:
+        client = GHLClient(transport=AiohttpTransport())
+        client._client.base_url = str(server.make_url("/v1"))
+        async with client:
+            yield client
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_transport_success(aiohttp_ghl_client):
+    """Test that a request round-trips through the aiohttp backend."""
+    result = await aiohttp_ghl_client.get_contact_info("contact123")
+
+    assert result == {"id": "contact123"}
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_transport_error_status(aiohttp_ghl_client):
+    """Test that error responses from the aiohttp backend raise HTTPStatusError."""
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        await aiohttp_ghl_client.get_contact_info("missing")
+
+    assert exc_info.value.response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_transport_stalled_body_raises_read_timeout(aiohttp_ghl_client):
+    """Test that a body read timeout from the aiohttp backend is an httpx error."""
+    aiohttp_ghl_client._client.timeout = httpx.Timeout(0.1)
+
+    with pytest.raises(httpx.ReadTimeout):
+        await aiohttp_ghl_client.get_contact_info("stalled")
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_transport_connect_failure():
+    """Test that aiohttp connection failures surface as httpx.TransportError."""
+    async with TestServer(web.Application()) as server:
+        closed_url = str(server.make_url("/v1"))
+
+    async with GHLClient(transport=AiohttpTransport()) as client:
+        client._client.base_url = closed_url
+        with pytest.raises(httpx.TransportError):
+            await client.get_pipeline_info("pipeline123")
@@ -0,0 +1,79 @@
+"""Tests for MCP server tool dispatch and HTTP endpoints."""
+
+import pytest
+from typing import Optional
+from fastapi.testclient import TestClient
+from mcp_server import _compile_dispatcher, app
+
+
+async def sample_tool(contact_id: str, limit: Optional[int] = 10):
+    """Echo the bound arguments."""
+    return {"contact_id": contact_id, "limit": limit}
+
+
+@pytest.fixture(scope="module")
+def dispatch():
+    """Compile a dispatcher for sample_tool."""
+    return _compile_dispatcher("sample_tool", sample_tool)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_binds_arguments(dispatch):
+    """Test that provided arguments are passed through."""
+    result = await dispatch({"contact_id": "c1", "limit": 5})
+
+    assert result == {"contact_id": "c1", "limit": 5}
+
+
+@pytest.mark.asyncio
+async def test_dispatch_uses_defaults(dispatch):
+    """Test that omitted optional arguments fall back to their defaults."""
+    result = await dispatch({"contact_id": "c1"})
+
+    assert result == {"contact_id": "c1", "limit": 10}
+
+
+@pytest.mark.asyncio
+async def test_dispatch_missing_required_argument(dispatch):
+    """Test that a missing required argument raises a TypeError naming it."""
+    with pytest.raises(TypeError, match="missing required argument: 'contact_id'"):
+        await dispatch({"limit": 5})
+
+
+@pytest.mark.asyncio
+async def test_dispatch_rejects_unknown_arguments(dispatch):
+    """Test that arguments outside the signature are rejected, not dropped."""
+    with pytest.raises(TypeError, match="unexpected arguments: contactId"):
+        await dispatch({"contact_id": "c1", "contactId": "c2"})
+
+
+@pytest.fixture(scope="module")
+def client():
+    """HTTP client for the app, without running the lifespan."""
+    return TestClient(app)
+
+
+def test_call_unknown_tool_returns_404_before_parsing(client):
+    """Test that unknown tools 404 even when the body is not valid JSON."""
+    response = client.post("/tools/no_such_tool", content=b"not json")
+
+    assert response.status_code == 404
+
+
+def test_call_tool_invalid_body_matches_fastapi_errors(client):
+    """Test that body validation errors match FastAPI's own 422 for the same body."""
+    body = {"tool_name": "get_contact_info"}
+    response = client.post("/tools/get_contact_info", json=body)
+    expected = client.post("/mcp/call_tool", json=body)
+
+    assert response.status_code == expected.status_code == 422
+    assert response.json()["detail"] == expected.json()["detail"]
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "arguments"]]
+
+
+def test_call_tool_malformed_json_reports_body_location(client):
+    """Test that malformed JSON is reported as a 422 located at the body."""
+    response = client.post("/tools/get_contact_info", content=b"{not json")
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][0] == "body"
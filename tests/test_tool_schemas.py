@@ -0,0 +1,12 @@
+"""Tests for pregenerated MCP tool schemas."""
+
+import orjson
+import mcp_tools
+from tool_schemas import SCHEMAS_PATH, build_tool_schemas
+
+
+def test_checked_in_schemas_match_tools():
+    """Test that tool_schemas.json is current; rerun scripts/gen_tool_schemas.py if not."""
+    tools = {name: getattr(mcp_tools, name) for name in mcp_tools.__all__}
+
+    assert orjson.loads(SCHEMAS_PATH.read_bytes()) == build_tool_schemas(tools)
@@ -0,0 +1,70 @@
+"""JSON Schema generation and loading for MCP tools."""
+
+import inspect
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Union, get_args, get_origin, get_type_hints
+
+import orjson
+
+# Generated by scripts/gen_tool_schemas.py
+SCHEMAS_PATH = Path(__file__).parent / "tool_schemas.json"
+
+# JSON Schema types for the Python annotations used by the tools
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+}
+
+
+def _json_schema_type(annotation: Any) -> Dict[str, Any]:
+    """Map a Python type annotation to a JSON Schema fragment."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        # Optional[X] is documented as X; the parameter is simply not required
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _json_schema_type(args[0]) if len(args) == 1 else {}
+    json_type = _JSON_TYPES.get(origin or annotation)
+    return {"type": json_type} if json_type else {}
+
+
+def input_schema(tool_func: Callable) -> Dict[str, Any]:
+    """Build the JSON Schema describing a tool's arguments."""
+    hints = get_type_hints(tool_func)
+    properties = {}
+    required = []
+    for name, param in inspect.signature(tool_func).parameters.items():
+        properties[name] = _json_schema_type(hints.get(name, Any))
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def build_tool_schemas(tools: Mapping[str, Callable]) -> List[Dict[str, Any]]:
+    """Introspect tool functions into name/description/inputSchema entries."""
+    return [
+        {
+            "name": name,
+            "description": func.__doc__ or "No description available",
+            "inputSchema": input_schema(func),
+        }
+        for name, func in tools.items()
+    ]
+
+
+def load_tool_schemas(tools: Mapping[str, Callable]) -> List[Dict[str, Any]]:
+    """Load pregenerated schemas, falling back to introspection if missing or the tool list differs.
+    
+    Only tool names are compared, so signature or docstring changes need a
+    rerun of scripts/gen_tool_schemas.py; tests/test_tool_schemas.py catches drift.
+    """
+    try:
+        schemas = orjson.loads(SCHEMAS_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return build_tool_schemas(tools)
+    if [schema["name"] for schema in schemas] != list(tools):
+        return build_tool_schemas(tools)
+    return schemas